@@ -50,7 +50,7 @@ def slow_fba(lb, ub, S, c):
     try:
 
         objective_function = np.asarray(c)
-        objective_function = np.asarray([-x for x in c])
+        objective_function = -np.asarray(c)
 
         res = linprog(
             objective_function, A_ub=A, b_ub=b, A_eq=S, b_eq=beq, bounds=(None, None)
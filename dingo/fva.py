@@ -85,7 +85,7 @@ def slow_fva(lb, ub, S, c, opt_percentage=100):
                 min_fluxes.append(lb[i])
 
             # Set the minus of the ith row of the A matrix as the objective function
-            objective_function = np.asarray([-x for x in objective_function])
+            objective_function = -objective_function
             res = linprog(
                 objective_function,
                 A_ub=A,
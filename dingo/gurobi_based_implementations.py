@@ -11,6 +11,20 @@ import scipy.sparse as sp
 import gurobipy as gp
 from gurobipy import GRB
 import math
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional; without it the helpers below run as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
 
 
 def fast_fba(lb, ub, S, c):
@@ -48,7 +62,6 @@ def fast_fba(lb, ub, S, c):
     A[n:] -= np.eye(n, n, dtype="float")
 
     b = np.concatenate((ub, -lb), axis=0)
-    b = np.asarray(b, dtype="float")
     b = np.ascontiguousarray(b, dtype="float")
 
     try:
@@ -75,10 +88,6 @@ def fast_fba(lb, ub, S, c):
                 # Make A sparse
                 A_sparse = sp.csr_matrix(A)
 
-                # Set the b and beq vectors as numpy vectors
-                b = np.array(b)
-                beq = np.array(beq)
-
                 # Add constraints
                 model.addMConstr(Aeq_sparse, x, "=", beq, name="c")
 
@@ -91,7 +100,7 @@ def fast_fba(lb, ub, S, c):
                 # Update the model with the extra constraints and then print it
                 model.update()
 
-                objective_function = np.asarray([-x for x in c])
+                objective_function = -np.asarray(c)
 
                 # Set the objective function in the model
                 model.setMObjective(
@@ -155,7 +164,6 @@ def fast_fva(lb, ub, S, c, opt_percentage=100):
     A[n:] -= np.eye(n, n, dtype="float")
 
     b = np.concatenate((ub, -lb), axis=0)
-    b = np.asarray(b, dtype="float")
     b = np.ascontiguousarray(b, dtype="float")
 
     # call fba to obtain an optimal solution
@@ -195,10 +203,6 @@ def fast_fva(lb, ub, S, c, opt_percentage=100):
                 # Make A sparse
                 A_sparse = sp.csr_matrix(A)
 
-                # Set the b and beq vectors as numpy vectors
-                b = np.array(b)
-                beq = np.array(beq)
-
                 # Add constraints
                 model.addMConstr(Aeq_sparse, x, "=", beq, name="c")
 
@@ -239,7 +243,7 @@ def fast_fva(lb, ub, S, c, opt_percentage=100):
                         min_fluxes.append(lb[i])
 
                     # Likewise, for the maximum
-                    objective_function = np.asarray([-x for x in objective_function])
+                    objective_function = -objective_function
                     model.setMObjective(
                         None, objective_function, 0.0, None, None, x, GRB.MINIMIZE
                     )
@@ -286,7 +290,25 @@ def update_model(model, n, Aeq_sparse, beq, lb, ub, A_sparse, b, objective_funct
     A_sparse -- a sparse matrix s.t. A_sparse x <= b
     b -- a vector matrix s.t. A_sparse x <= b
     objective_function -- the objective function, i.e., a n-dimensional vector
+
+    When the given data has the same shapes as the data the model was last
+    built with, only the bounds, the right-hand sides and the objective are
+    updated in place; the variables and constraints are not recreated.
     """
+    dims = (n, Aeq_sparse.shape, A_sparse.shape)
+
+    if getattr(model, "_dingo_dims", None) == dims:
+        x = model.getVars()
+        model.setAttr("LB", x, lb)
+        model.setAttr("UB", x, ub)
+        constrs = model.getConstrs()
+        model.setAttr("RHS", constrs[: Aeq_sparse.shape[0]], beq)
+        model.setAttr("RHS", constrs[Aeq_sparse.shape[0] :], b)
+        model.setAttr("Obj", x, objective_function)
+        model.update()
+
+        return model
+
     model.remove(model.getVars())
     model.update()
     model.remove(model.getConstrs())
@@ -298,29 +320,124 @@ def update_model(model, n, Aeq_sparse, beq, lb, ub, A_sparse, b, objective_funct
         lb=lb,
         ub=ub,
     )
-    model.update()
     model.addMConstr(Aeq_sparse, x, "=", beq, name="c")
-    model.update()
     model.addMConstr(A_sparse, x, "<", b, name="d")
-    model.update()
     model.setMObjective(None, objective_function, 0.0, None, None, x, GRB.MINIMIZE)
     model.update()
 
+    # user data slot to recognize the structure on the next call
+    model._dingo_dims = dims
+
     return model
 
 
-def fast_remove_redundant_facets(lb, ub, S, c, opt_percentage=100):
+@njit(cache=True)
+def _classify_facet(
+    min_objective,
+    max_objective,
+    redundant_facet_left,
+    redundant_facet_right,
+    redundant_facet_tol,
+):
+    """A helper function to classify dimension i after its redundancy tests
+    Returns 0 if both facets are redundant, 1 if the width of the interval
+    is small enough to set an equality, 2 if the dimension has to be kept
+    """
+    if (not redundant_facet_left) or (not redundant_facet_right):
+        width = abs(max_objective - min_objective)
+        if width < redundant_facet_tol:
+            return 1
+        return 2
+    return 0
+
+
+def _facet_objective_lps(args):
+    """A helper function to solve a chunk of the per-coordinate objective LPs
+    on a private gurobi model; these base LPs are independent within an outer
+    pass, so chunks can be solved by different processes. The redundancy tests
+    themselves are not run here, because they have to see the effect of the
+    removals made earlier in the same pass on the live model of the driver
+    Returns a list of tuples (index, sign, objective value), where the
+    objective value is None if the LP was not solved to optimality
+    """
+    (
+        jobs_chunk,
+        S,
+        lb,
+        ub,
+        c,
+        val,
+        eq_indices,
+        eq_values,
+    ) = args
+
+    n = S.shape[1]
+    results = []
+
+    with gp.Env(empty=True) as env:
+        env.setParam("OutputFlag", 0)
+        env.start()
+
+        with gp.Model(env=env) as model:
+
+            x = model.addMVar(
+                shape=n,
+                vtype=GRB.CONTINUOUS,
+                name="x",
+                lb=lb,
+                ub=ub,
+            )
+            model.addMConstr(sp.csr_matrix(S), x, "=", np.zeros(S.shape[0]), name="c")
+            model.addConstr((-c) @ x <= val, name="d")
+
+            if len(eq_indices) > 0:
+                eq_csr = sp.csr_matrix(
+                    (
+                        np.ones(len(eq_indices)),
+                        (np.arange(len(eq_indices)), eq_indices),
+                    ),
+                    shape=(len(eq_indices), n),
+                )
+                model.addMConstr(eq_csr, x, "=", eq_values, name="c")
+
+            model.update()
+            x_vars = model.getVars()
+            model.ModelSense = GRB.MINIMIZE
+            model.Params.LPWarmStart = 2
+            model.Params.Method = 1
+            model.Params.Presolve = 0
+
+            objective = np.zeros(n)
+            for i, sign in jobs_chunk:
+
+                # minimize sign * x_i
+                objective[i] = sign
+                model.setAttr("Obj", x_vars, objective)
+                model.optimize()
+                if model.status == GRB.OPTIMAL:
+                    results.append((i, sign, model.getObjective().getValue()))
+                else:
+                    results.append((i, sign, None))
+                objective[i] = 0.0
+
+    return results
+
+
+def fast_remove_redundant_facets(lb, ub, S, c, opt_percentage=100, num_workers=1):
     """A function to find and remove the redundant facets and to find
     the facets with very small offset and to set them as equalities
 
     Keyword arguments:
     lb -- lower bounds for the fluxes, i.e., a n-dimensional vector
     ub -- upper bounds for the fluxes, i.e., a n-dimensional vector
-    S -- the mxn stoichiometric matrix, s.t. Sv = 0
+    S -- the mxn stoichiometric matrix, dense or scipy sparse, s.t. Sv = 0
     c -- the objective function to maximize
     opt_percentage -- consider solutions that give you at least a certain
                       percentage of the optimal solution (default is to consider
                       optimal solutions only)
+    num_workers -- the number of processes to distribute the per-coordinate
+                   objective LPs over (default is to solve them all in a
+                   single process)
     """
 
     if lb.size != S.shape[1] or ub.size != S.shape[1]:
@@ -337,12 +454,9 @@ def fast_remove_redundant_facets(lb, ub, S, c, opt_percentage=100):
     beq = np.zeros(m)
     Aeq_res = S
 
-    A = np.zeros((2 * n, n), dtype="float")
-    A[0:n] = np.eye(n)
-    A[n:] -= np.eye(n, n, dtype="float")
-
+    # The facet normals are just +/- the unit vectors, so we never build the
+    # dense 2n x n stack of identities; rows are recorded as (index, sign)
     b = np.concatenate((ub, -lb), axis=0)
-    b = np.asarray(b, dtype="float")
     b = np.ascontiguousarray(b, dtype="float")
 
     # call fba to obtain an optimal solution
@@ -351,6 +465,9 @@ def fast_remove_redundant_facets(lb, ub, S, c, opt_percentage=100):
 
     b_res = []
     A_res = np.empty((0, n), float)
+    A_res_rows = []
+    Aeq_res_extra_rows = []
+    beq_res_extra = []
     beq_res = np.array(beq)
 
     try:
@@ -360,10 +477,10 @@ def fast_remove_redundant_facets(lb, ub, S, c, opt_percentage=100):
             env.setParam("OutputFlag", 0)
             env.start()
 
-            with gp.Model(env=env) as model:
+            with gp.Model(env=env) as model_iter:
 
                 # Create variables
-                x = model.addMVar(
+                x = model_iter.addMVar(
                     shape=n,
                     vtype=GRB.CONTINUOUS,
                     name="x",
@@ -374,27 +491,50 @@ def fast_remove_redundant_facets(lb, ub, S, c, opt_percentage=100):
                 # Make sparse Aeq
                 Aeq_sparse = sp.csr_matrix(S)
 
-                # Make A sparse
-                A_sparse = sp.csr_matrix(np.array(-c))
-                b_sparse = np.array(val)
-
-                # Set the b and beq vectors as numpy vectors
-                b = np.array(b)
-                beq = np.array(beq)
-
                 # Add constraints
-                model.addMConstr(Aeq_sparse, x, "=", beq, name="c")
+                model_iter.addMConstr(Aeq_sparse, x, "=", beq, name="c")
 
                 # Update the model to include the constraints added
-                model.update()
+                model_iter.update()
 
-                # Add constraints for the uneqalities of A
-                model.addMConstr(A_sparse, x, "<", [val], name="d")
+                # Add the single inequality on the objective as an expression;
+                # a one-row matrix constraint would only add CSR overhead
+                model_iter.addConstr((-c) @ x <= val, name="d")
 
                 # Update the model with the extra constraints and then print it
-                model.update()
-
-                model_iter = model.copy()
+                model_iter.update()
+
+                # The model is built only once; in the loop below we modify
+                # only its objective and its variable bounds in place
+                x_vars = model_iter.getVars()
+                model_iter.ModelSense = GRB.MINIMIZE
+
+                # Consecutive LPs differ only in the objective or in a single
+                # bound, so let simplex start from the previous optimal basis;
+                # dual simplex without presolve re-uses that basis directly
+                # instead of restarting from a cold, presolved state
+                model_iter.Params.LPWarmStart = 2
+                model_iter.Params.Method = 1
+                model_iter.Params.Presolve = 0
+
+                # The FBA optimum is a feasible point of the polytope, so hand
+                # it to simplex as the primal start for the very first LP; the
+                # retained basis then carries the warm start through the rest
+                model_iter.setAttr("PStart", x_vars, max_biomass_flux_vector)
+                constrs = model_iter.getConstrs()
+                model_iter.setAttr("DStart", constrs, np.zeros(len(constrs)))
+
+                # Reusable objective buffers; entry i is set before each solve
+                # and cleared again at the end of the iteration
+                zero_objective = np.zeros(n)
+                objective_function = np.zeros(n)
+                objective_function_max = np.zeros(n)
+
+                # Envelope of the feasible points seen so far, seeded with the
+                # FBA optimum; when it certifies that a bound is attained, the
+                # corresponding LP does not have to be solved at all
+                feas_min = np.array(max_biomass_flux_vector, dtype="float")
+                feas_max = np.array(max_biomass_flux_vector, dtype="float")
 
                 # initialize
                 indices_iter = range(n)
@@ -411,192 +551,254 @@ def fast_remove_redundant_facets(lb, ub, S, c, opt_percentage=100):
                     indices = indices_iter
                     indices_iter = []
 
-                    Aeq_sparse = sp.csr_matrix(Aeq_res)
-                    beq = np.array(beq_res)
+                    # Batch-solve the two objective LPs of every index in this
+                    # pass, either sequentially on the persistent model or
+                    # distributed over worker processes; the redundancy tests
+                    # below always run on the live model
+                    max_objectives = {}
+                    min_objectives = {}
+                    if len(indices) > 0:
+
+                        # Pre-filter: when a feasible point already attains a
+                        # bound (within tolerance), the optimum is that bound
+                        # and no LP is needed for it
+                        lp_jobs = []
+                        for idx in indices:
+                            if ub[idx] - feas_max[idx] <= redundant_facet_tol:
+                                max_objectives[idx] = ub[idx]
+                            else:
+                                lp_jobs.append((idx, -1.0))
+                            if feas_min[idx] - lb[idx] <= redundant_facet_tol:
+                                min_objectives[idx] = lb[idx]
+                            else:
+                                lp_jobs.append((idx, 1.0))
+
+                        job_results = []
+                        if num_workers > 1 and len(lp_jobs) > 0:
+                            # Only the base LPs are farmed out; the workers
+                            # solve them against the state at the pass start
+                            chunk_size = math.ceil(len(lp_jobs) / num_workers)
+                            args_list = [
+                                (
+                                    lp_jobs[k : k + chunk_size],
+                                    S,
+                                    lb.copy(),
+                                    ub.copy(),
+                                    c,
+                                    val,
+                                    list(Aeq_res_extra_rows),
+                                    list(beq_res_extra),
+                                )
+                                for k in range(0, len(lp_jobs), chunk_size)
+                            ]
+                            with ProcessPoolExecutor(max_workers=num_workers) as pool:
+                                for chunk_results in pool.map(
+                                    _facet_objective_lps, args_list
+                                ):
+                                    job_results.extend(chunk_results)
+
+                        elif len(lp_jobs) > 0:
+                            # Warm-started single simplex solves return the
+                            # objective values vertex-exact, which the 1e-07
+                            # redundancy tolerance below relies on.  After
+                            # zeroing the objective once, each solve only
+                            # touches the single coefficient that changes; the
+                            # scalar writes sit in the lazy-update queue until
+                            # optimize() flushes them
+                            model_iter.setAttr("Obj", x_vars, zero_objective)
+                            for idx, sign in lp_jobs:
+                                x_vars[idx].Obj = sign
+                                model_iter.optimize()
+                                if model_iter.status == GRB.OPTIMAL:
+                                    job_results.append(
+                                        (idx, sign, model_iter.getObjective().getValue())
+                                    )
+                                else:
+                                    job_results.append((idx, sign, None))
+                                x_vars[idx].Obj = 0.0
+
+                        for idx, sign, lp_objective in job_results:
+                            if sign < 0:
+                                if lp_objective is not None:
+                                    max_objectives[idx] = -lp_objective
+                                    # the optimum is attained at a feasible point
+                                    feas_max[idx] = max(feas_max[idx], -lp_objective)
+                                else:
+                                    max_objectives[idx] = ub[idx]
+                            else:
+                                if lp_objective is not None:
+                                    min_objectives[idx] = lp_objective
+                                    feas_min[idx] = min(feas_min[idx], lp_objective)
+                                else:
+                                    min_objectives[idx] = lb[idx]
 
                     b_res = []
-                    A_res = np.empty((0, n), float)
+                    A_res_rows = []
                     for i in indices:
 
-                        # Set the ith row of the A matrix as the objective function
-                        objective_function = A[
-                            i,
-                        ]
+                        # The objective function is the i-th unit vector
+                        objective_function[i] = 1.0
 
                         redundant_facet_right = True
                         redundant_facet_left = True
 
                         # for the maximum
-                        objective_function_max = np.asarray(
-                            [-x for x in objective_function]
-                        )
-                        model_iter = update_model(
-                            model_iter,
-                            n,
-                            Aeq_sparse,
-                            beq,
-                            lb,
-                            ub,
-                            A_sparse,
-                            [val],
-                            objective_function_max,
-                        )
-                        model_iter.optimize()
-
-                        # Again if optimized
-                        status = model_iter.status
-                        if status == GRB.OPTIMAL:
-                            # Get the max objective value
-                            max_objective = -model_iter.getObjective().getValue()
-                        else:
-                            max_objective = ub[i]
+                        objective_function_max[i] = -1.0
+                        max_objective = max_objectives[i]
 
                         # if this facet was not removed in a previous iteration
                         if not facet_right_removed[0, i]:
-                            ub_iter = ub.copy()
-                            ub_iter[i] = ub_iter[i] + 1
-                            model_iter = update_model(
-                                model_iter,
-                                n,
-                                Aeq_sparse,
-                                beq,
-                                lb,
-                                ub_iter,
-                                A_sparse,
-                                [val],
-                                objective_function_max,
-                            )
-                            model_iter.optimize()
-
-                            status = model_iter.status
-                            if status == GRB.OPTIMAL:
-                                # Get the max objective value with relaxed inequality
-                                max_objective2 = -model_iter.getObjective().getValue()
-                                if (
-                                    np.abs(max_objective2 - max_objective)
-                                    > redundant_facet_tol
-                                ):
-                                    redundant_facet_right = False
-                                else:
-                                    removed += 1
-                                    facet_right_removed[0, i] = True
-
-                        model_iter = update_model(
-                            model_iter,
-                            n,
-                            Aeq_sparse,
-                            beq,
-                            lb,
-                            ub,
-                            A_sparse,
-                            [val],
-                            objective_function,
-                        )
-                        model_iter.optimize()
 
-                        # If optimized
-                        status = model_iter.status
-                        if status == GRB.OPTIMAL:
-                            # Get the min objective value
-                            min_objective = model_iter.getObjective().getValue()
-                        else:
-                            min_objective = lb[i]
+                            # If the upper bound has slack at the optimum, then
+                            # relaxing it cannot change the optimum and the
+                            # facet is redundant; no extra LP is needed
+                            if ub[i] - max_objective > redundant_facet_tol:
+                                removed += 1
+                                facet_right_removed[0, i] = True
+                            else:
+                                # Relax the bound in place and restore it afterwards
+                                model_iter.setAttr("Obj", x_vars, objective_function_max)
+                                x_vars[i].UB = ub[i] + 1
+                                model_iter.optimize()
+                                x_vars[i].UB = ub[i]
+
+                                status = model_iter.status
+                                if status == GRB.OPTIMAL:
+                                    # Get the max objective value with relaxed inequality
+                                    max_objective2 = -model_iter.getObjective().getValue()
+                                    if (
+                                        np.abs(max_objective2 - max_objective)
+                                        > redundant_facet_tol
+                                    ):
+                                        redundant_facet_right = False
+                                    else:
+                                        removed += 1
+                                        facet_right_removed[0, i] = True
+
+                        # for the minimum
+                        min_objective = min_objectives[i]
 
                         # if this facet was not removed in a previous iteration
                         if not facet_left_removed[0, i]:
-                            lb_iter = lb.copy()
-                            lb_iter[i] = lb_iter[i] - 1
-                            model_iter = update_model(
-                                model_iter,
-                                n,
-                                Aeq_sparse,
-                                beq,
-                                lb_iter,
-                                ub,
-                                A_sparse,
-                                [val],
-                                objective_function,
-                            )
-                            model_iter.optimize()
-
-                            status = model_iter.status
-                            if status == GRB.OPTIMAL:
-                                # Get the min objective value with relaxed inequality
-                                min_objective2 = model_iter.getObjective().getValue()
-                                if (
-                                    np.abs(min_objective2 - min_objective)
-                                    > redundant_facet_tol
-                                ):
-                                    redundant_facet_left = False
-                                else:
-                                    removed += 1
-                                    facet_left_removed[0, i] = True
 
-                        if (not redundant_facet_left) or (not redundant_facet_right):
-                            width = abs(max_objective - min_objective)
+                            # If the lower bound has slack at the optimum, then
+                            # relaxing it cannot change the optimum and the
+                            # facet is redundant; no extra LP is needed
+                            if min_objective - lb[i] > redundant_facet_tol:
+                                removed += 1
+                                facet_left_removed[0, i] = True
+                            else:
+                                # Relax the bound in place and restore it afterwards
+                                model_iter.setAttr("Obj", x_vars, objective_function)
+                                x_vars[i].LB = lb[i] - 1
+                                model_iter.optimize()
+                                x_vars[i].LB = lb[i]
+
+                                status = model_iter.status
+                                if status == GRB.OPTIMAL:
+                                    # Get the min objective value with relaxed inequality
+                                    min_objective2 = model_iter.getObjective().getValue()
+                                    if (
+                                        np.abs(min_objective2 - min_objective)
+                                        > redundant_facet_tol
+                                    ):
+                                        redundant_facet_left = False
+                                    else:
+                                        removed += 1
+                                        facet_left_removed[0, i] = True
+
+                        facet_case = _classify_facet(
+                            min_objective,
+                            max_objective,
+                            redundant_facet_left,
+                            redundant_facet_right,
+                            redundant_facet_tol,
+                        )
+                        if facet_case != 0:
 
                             # Check whether the offset in this dimension is small (and set an equality)
-                            if width < redundant_facet_tol:
+                            if facet_case == 1:
                                 offset += 1
-                                Aeq_res = np.vstack(
-                                    (
-                                        Aeq_res,
-                                        A[
-                                            i,
-                                        ],
-                                    )
-                                )
-                                beq_res = np.append(
-                                    beq_res, min(max_objective, min_objective)
+                                Aeq_res_extra_rows.append(i)
+                                beq_res_extra.append(min(max_objective, min_objective))
+
+                                # Promote the facet in the model right away
+                                # with a single unit-row equality; no matrix
+                                # surgery on the equality system is needed
+                                model_iter.addMConstr(
+                                    sp.csr_matrix(([1.0], ([0], [i])), shape=(1, n)),
+                                    x,
+                                    "=",
+                                    [beq_res_extra[-1]],
+                                    name="c",
                                 )
+
+                                # The new equality shrinks the feasible region,
+                                # so earlier points may no longer certify bounds
+                                feas_min[:] = np.inf
+                                feas_max[:] = -np.inf
                                 # Remove the bounds on this dimension
                                 ub[i] = sys.float_info.max
                                 lb[i] = -sys.float_info.max
+                                x_vars[i].UB = ub[i]
+                                x_vars[i].LB = lb[i]
                             else:
                                 # store this dimension
                                 indices_iter.append(i)
 
                                 if not redundant_facet_left:
                                     # Not a redundant inequality
-                                    A_res = np.append(
-                                        A_res,
-                                        np.array(
-                                            [
-                                                A[
-                                                    n + i,
-                                                ]
-                                            ]
-                                        ),
-                                        axis=0,
-                                    )
+                                    A_res_rows.append((i, -1.0))
                                     b_res.append(b[n + i])
                                 else:
                                     lb[i] = -sys.float_info.max
+                                    x_vars[i].LB = lb[i]
 
                                 if not redundant_facet_right:
                                     # Not a redundant inequality
-                                    A_res = np.append(
-                                        A_res,
-                                        np.array(
-                                            [
-                                                A[
-                                                    i,
-                                                ]
-                                            ]
-                                        ),
-                                        axis=0,
-                                    )
+                                    A_res_rows.append((i, 1.0))
                                     b_res.append(b[i])
                                 else:
                                     ub[i] = sys.float_info.max
+                                    x_vars[i].UB = ub[i]
                         else:
                             # Remove the bounds on this dimension
                             ub[i] = sys.float_info.max
                             lb[i] = -sys.float_info.max
+                            x_vars[i].UB = ub[i]
+                            x_vars[i].LB = lb[i]
+
+                        # Clear the objective buffers for the next index
+                        objective_function[i] = 0.0
+                        objective_function_max[i] = 0.0
 
+                # Materialize the collected rows once, at return time
                 b_res = np.asarray(b_res)
-                A_res = np.asarray(A_res, dtype="float")
-                A_res = np.ascontiguousarray(A_res, dtype="float")
+                A_res = np.zeros((len(A_res_rows), n), dtype="float")
+                for row, (idx, sign) in enumerate(A_res_rows):
+                    A_res[row, idx] = sign
+                if Aeq_res_extra_rows:
+                    if sp.issparse(Aeq_res):
+                        eq_block = sp.csr_matrix(
+                            (
+                                np.ones(len(Aeq_res_extra_rows)),
+                                (
+                                    np.arange(len(Aeq_res_extra_rows)),
+                                    Aeq_res_extra_rows,
+                                ),
+                            ),
+                            shape=(len(Aeq_res_extra_rows), n),
+                        )
+                        Aeq_res = sp.vstack((Aeq_res, eq_block), format="csr")
+                    else:
+                        eq_block = np.zeros(
+                            (len(Aeq_res_extra_rows), n), dtype="float"
+                        )
+                        eq_block[
+                            np.arange(len(Aeq_res_extra_rows)), Aeq_res_extra_rows
+                        ] = 1.0
+                        Aeq_res = np.vstack((Aeq_res, eq_block))
+                    beq_res = np.append(beq_res, beq_res_extra)
 
                 return (
                     A_res,
@@ -9,7 +9,10 @@ import unittest
 import os
 import numpy as np
 from dingo import MetabolicNetwork, PolytopeSampler
-from dingo.gurobi_based_implementations import fast_inner_ball
+from dingo.gurobi_based_implementations import (
+    fast_inner_ball,
+    fast_remove_redundant_facets,
+)
 
 class TestFastMethods(unittest.TestCase):
     def test_fast_max_bal_computation(self):
@@ -58,6 +61,67 @@ class TestFastMethods(unittest.TestCase):
 
         self.assertEqual(steady_states.shape[0], 95)
 
+    def test_fast_remove_redundant_facets_parallel(self):
+
+        current_directory = os.getcwd()
+        input_file_json = current_directory + "/ext_data/e_coli_core.json"
+
+        model = MetabolicNetwork.from_json(input_file_json)
+        model.set_fast_mode()
+
+        # the parallel path has to return the same polytope as the default one
+        lb, ub = model.lb.copy(), model.ub.copy()
+        A, b, Aeq, beq = fast_remove_redundant_facets(
+            lb, ub, model.S, model.biomass_function
+        )
+
+        lb, ub = model.lb.copy(), model.ub.copy()
+        A2, b2, Aeq2, beq2 = fast_remove_redundant_facets(
+            lb, ub, model.S, model.biomass_function, num_workers=2
+        )
+
+        self.assertEqual(A.shape, A2.shape)
+        self.assertEqual(Aeq.shape, Aeq2.shape)
+        self.assertTrue(np.all(A == A2))
+        self.assertTrue(np.max(np.abs(b - b2)) < 1e-06)
+        self.assertTrue(np.all(Aeq == Aeq2))
+        self.assertTrue(np.max(np.abs(beq - beq2)) < 1e-06)
+
+    def test_fast_remove_redundant_facets_random_models(self):
+
+        # random well-scaled models are less structured than e_coli_core and
+        # exercise the tolerance boundary of the facet classification; the
+        # default and the parallel path have to return the same polytope on
+        # every one of them
+        m = 5
+        n = 15
+
+        for seed in range(5):
+            rng = np.random.RandomState(seed)
+
+            S = np.round(rng.normal(0, 1, (m, n)), 1)
+            c = np.round(rng.normal(0, 1, n), 1)
+            lb = -np.ones(n, dtype="float")
+            ub = np.ones(n, dtype="float")
+
+            # widen a few bounds so that some facets are actually redundant
+            ub[rng.choice(n, 5, replace=False)] = 100.0
+            lb[rng.choice(n, 5, replace=False)] = -100.0
+
+            A, b, Aeq, beq = fast_remove_redundant_facets(
+                lb.copy(), ub.copy(), S, c
+            )
+            A2, b2, Aeq2, beq2 = fast_remove_redundant_facets(
+                lb.copy(), ub.copy(), S, c, num_workers=2
+            )
+
+            self.assertEqual(A.shape, A2.shape)
+            self.assertEqual(Aeq.shape, Aeq2.shape)
+            self.assertTrue(np.all(A == A2))
+            self.assertTrue(np.all(np.abs(b - b2) < 1e-06))
+            self.assertTrue(np.all(Aeq == Aeq2))
+            self.assertTrue(np.all(np.abs(beq - beq2) < 1e-06))
+
     def test_fast_fba(self):
 
         current_directory = os.getcwd()